@@ -1,2 +1,2 @@
-__all__ = ["ui", "popups", "data"]
+__all__ = ["ui", "popups", "data", "compiler"]
 __version__ = "0.1.0"
@@ -0,0 +1,324 @@
+# group_design/compiler.py
+"""
+Compile the location table (data/external_db.json) from CSV sources.
+
+Three source files are expected in the sources directory:
+
+    wind.csv         state,district,wind
+    seismic.csv      state,district,seismic_zone,seismic_factor
+    temperature.csv  state,district,temp_max,temp_min
+
+Every district must appear exactly once in each file. Rows are validated and
+cross-checked (zone vs factor, temp_max > temp_min, plausible ranges) before
+being written in the same State -> District -> values layout that
+load_external_db() reads.
+
+Rebuilds are incremental at the file level: a manifest next to the output keeps
+the hash and parsed rows of each source file plus the compiled records. A file
+whose hash is unchanged is not parsed again, and only districts whose rows
+changed in a modified file are validated again. The manifest also records a
+fingerprint of the validation rules; if the rules change, or the manifest is
+malformed, it is ignored and every district is rebuilt.
+
+Usage:
+    python -m group_design.compiler data/sources [-o data/external_db.json] [--full]
+"""
+import os
+import sys
+import csv
+import io
+import json
+import math
+import hashlib
+import argparse
+
+SOURCES = {
+    "wind": ("wind.csv", ("wind",)),
+    "seismic": ("seismic.csv", ("seismic_zone", "seismic_factor")),
+    "temperature": ("temperature.csv", ("temp_max", "temp_min")),
+}
+
+# IS 1893 (Part 1) zone factors
+ZONE_FACTORS = {"II": 0.10, "III": 0.16, "IV": 0.24, "V": 0.36}
+
+# Plausibility limits: basic wind speed (m/s) and shade air temperature (deg C)
+WIND_RANGE = (10.0, 100.0)
+TEMP_RANGE = (-60.0, 60.0)
+
+MANIFEST_VERSION = 2
+
+RECORD_FIELDS = {"wind", "seismic_zone", "seismic_factor", "temp_max", "temp_min"}
+
+
+class LocationDataError(ValueError):
+    """Raised when the CSV sources fail validation; .errors lists every problem."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__("\n".join(self.errors))
+
+
+def default_output_path():
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    return os.path.join(root, "data", "external_db.json")
+
+
+def manifest_path_for(output_path):
+    return os.path.splitext(output_path)[0] + ".manifest.json"
+
+
+def parse_source(filename, columns, text):
+    """Return ({(state, district): values}, errors) for one CSV source."""
+    rows = {}
+    errors = []
+    reader = csv.DictReader(io.StringIO(text, newline=""))
+    header = [h.strip() for h in (reader.fieldnames or [])]
+    missing = [c for c in ("state", "district") + columns if c not in header]
+    if missing:
+        return rows, [f"{filename}: missing column(s) {', '.join(missing)}"]
+    reader.fieldnames = header
+    for raw in reader:
+        # line_num is the physical line the record ends on, so blank lines and
+        # quoted multi-line fields don't shift the reported position
+        lineno = reader.line_num
+        state = (raw["state"] or "").strip()
+        district = (raw["district"] or "").strip()
+        if not state or not district:
+            errors.append(f"{filename}:{lineno}: state and district are required")
+            continue
+        if (state, district) in rows:
+            errors.append(f"{filename}:{lineno}: duplicate row for {state} / {district}")
+            continue
+        rows[(state, district)] = {c: (raw[c] or "").strip() for c in columns}
+    return rows, errors
+
+
+def _number(value, name, where, errors, limits=None):
+    try:
+        x = float(value)
+    except (TypeError, ValueError):
+        errors.append(f"{where}: {name} '{value}' is not a number")
+        return None
+    if not math.isfinite(x):
+        errors.append(f"{where}: {name} '{value}' is not a finite number")
+        return None
+    if limits and not limits[0] <= x <= limits[1]:
+        errors.append(f"{where}: {name} {x:g} is outside {limits[0]:g}..{limits[1]:g}")
+        return None
+    return x
+
+
+def _as_int_if_whole(x):
+    return int(x) if x is not None and float(x).is_integer() else x
+
+
+def compile_district(key, sources):
+    """Validate one district's source rows and return (record, errors)."""
+    where = f"{key[0]} / {key[1]}"
+    errors = []
+    for source, (filename, _) in SOURCES.items():
+        if source not in sources:
+            errors.append(f"{where}: no row in {filename}")
+    if errors:
+        return None, errors
+
+    wind = _number(sources["wind"]["wind"], "wind", where, errors, WIND_RANGE)
+
+    zone = sources["seismic"]["seismic_zone"].upper()
+    factor = _number(sources["seismic"]["seismic_factor"], "seismic_factor", where, errors)
+    if zone not in ZONE_FACTORS:
+        errors.append(f"{where}: unknown seismic zone '{zone}' (expected {', '.join(ZONE_FACTORS)})")
+    elif factor is not None and abs(factor - ZONE_FACTORS[zone]) > 1e-9:
+        errors.append(f"{where}: seismic factor {factor:g} does not match zone {zone} ({ZONE_FACTORS[zone]:g})")
+
+    tmax = _number(sources["temperature"]["temp_max"], "temp_max", where, errors, TEMP_RANGE)
+    tmin = _number(sources["temperature"]["temp_min"], "temp_min", where, errors, TEMP_RANGE)
+    if tmax is not None and tmin is not None and tmax <= tmin:
+        errors.append(f"{where}: temp_max ({tmax:g}) must be greater than temp_min ({tmin:g})")
+
+    if errors:
+        return None, errors
+    record = {
+        "wind": _as_int_if_whole(wind),
+        "seismic_zone": zone,
+        "seismic_factor": factor,
+        "temp_max": _as_int_if_whole(tmax),
+        "temp_min": _as_int_if_whole(tmin),
+    }
+    return record, []
+
+
+def rules_fingerprint():
+    """Hash of the validation rules; cached records from other rules are not reused."""
+    rules = [MANIFEST_VERSION, SOURCES, ZONE_FACTORS, WIND_RANGE, TEMP_RANGE]
+    return hashlib.sha256(json.dumps(rules, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _is_name_pair(s, d):
+    return isinstance(s, str) and isinstance(d, str) and s and d
+
+
+def _is_number(x):
+    return isinstance(x, (int, float)) and not isinstance(x, bool) and math.isfinite(x)
+
+
+def _parse_manifest(manifest):
+    """Return (files, records), raising ValueError on any unexpected shape."""
+    if not isinstance(manifest, dict) or manifest.get("rules") != rules_fingerprint():
+        raise ValueError("stale manifest")
+    files = {}
+    for source, entry in manifest["files"].items():
+        columns = set(SOURCES[source][1])
+        if not isinstance(entry["hash"], str):
+            raise ValueError(f"bad hash for {source}")
+        rows = {}
+        for s, d, values in entry["rows"]:
+            if (not _is_name_pair(s, d) or not isinstance(values, dict) or set(values) != columns
+                    or not all(isinstance(v, str) for v in values.values())):
+                raise ValueError(f"bad row in {source}")
+            rows[(s, d)] = values
+        files[source] = {"hash": entry["hash"], "rows": rows}
+    records = {}
+    for s, d, record in manifest["records"]:
+        if (not _is_name_pair(s, d) or not isinstance(record, dict) or set(record) != RECORD_FIELDS
+                or record["seismic_zone"] not in ZONE_FACTORS
+                or not all(_is_number(record[k]) for k in RECORD_FIELDS - {"seismic_zone"})):
+            raise ValueError("bad record")
+        records[(s, d)] = record
+    return files, records
+
+
+def load_manifest(path):
+    """Return (files, records) from a previous build, or empty ones if the
+    manifest is missing, malformed or was written under different rules."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return _parse_manifest(json.load(f))
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return {}, {}
+
+
+def _write_json(path, obj, indent=None):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(json.dumps(obj, indent=indent, ensure_ascii=False, allow_nan=False) + "\n")
+    os.replace(tmp, path)
+
+
+def _changed_keys(old, new):
+    return {k for k in old.keys() | new.keys() if old.get(k) != new.get(k)}
+
+
+def build(sources_dir, output_path=None, full=False):
+    """
+    Compile the sources into output_path. Nothing is written if any district
+    fails validation; a LocationDataError carrying all problems is raised instead.
+    Returns a dict of counts: total, rebuilt, reused, removed.
+    """
+    output_path = output_path or default_output_path()
+    manifest_path = manifest_path_for(output_path)
+    prev_files, prev_records = load_manifest(manifest_path)
+    if full:
+        # Only the district names are kept, for the "removed" count
+        prev_files, prev_records = {}, dict.fromkeys(prev_records)
+
+    # Read each source; unchanged files reuse their parsed rows from the manifest
+    files = {}
+    dirty = set()
+    errors = []
+    for source, (filename, columns) in SOURCES.items():
+        path = os.path.join(sources_dir, filename)
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+        except OSError:
+            errors.append(f"{filename}: file not found")
+            continue
+        digest = hashlib.sha256(raw).hexdigest()
+        cached = prev_files.get(source)
+        if cached and cached["hash"] == digest:
+            rows = cached["rows"]
+        else:
+            try:
+                text = raw.decode("utf-8-sig")
+            except UnicodeDecodeError:
+                errors.append(f"{filename}: not valid UTF-8")
+                continue
+            rows, problems = parse_source(filename, columns, text)
+            errors.extend(problems)
+            dirty |= _changed_keys(cached["rows"], rows) if cached else rows.keys()
+        files[source] = {"hash": digest, "rows": rows}
+
+    # File-level problems make every per-district check meaningless
+    if errors:
+        raise LocationDataError(errors)
+
+    districts = {}
+    for source, entry in files.items():
+        for key, values in entry["rows"].items():
+            districts.setdefault(key, {})[source] = values
+    if not districts:
+        raise LocationDataError([f"{sources_dir}: no location rows found"])
+
+    records = {}
+    rebuilt = reused = 0
+    for key, sources in districts.items():
+        if not full and key not in dirty and key in prev_records:
+            records[key] = prev_records[key]
+            reused += 1
+        else:
+            record, problems = compile_district(key, sources)
+            errors.extend(problems)
+            records[key] = record
+            rebuilt += 1
+
+    if errors:
+        raise LocationDataError(errors)
+
+    db = {}
+    for (state, district), record in records.items():
+        db.setdefault(state, {})[district] = record
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "rules": rules_fingerprint(),
+        "files": {
+            source: {"hash": entry["hash"], "rows": [[s, d, v] for (s, d), v in entry["rows"].items()]}
+            for source, entry in files.items()
+        },
+        "records": [[s, d, r] for (s, d), r in records.items()],
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    _write_json(output_path, db, indent=2)
+    _write_json(manifest_path, manifest)
+
+    return {
+        "total": len(records),
+        "rebuilt": rebuilt,
+        "reused": reused,
+        "removed": len(prev_records.keys() - records.keys()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile location CSVs into the runtime location table.")
+    parser.add_argument("sources", help="directory containing wind.csv, seismic.csv and temperature.csv")
+    parser.add_argument("-o", "--output", default=None, help="output JSON (default: data/external_db.json)")
+    parser.add_argument("--full", action="store_true", help="ignore cached files and revalidate every district")
+    args = parser.parse_args(argv)
+
+    try:
+        stats = build(args.sources, args.output, full=args.full)
+    except LocationDataError as e:
+        print(f"{len(e.errors)} problem(s) found, nothing written:", file=sys.stderr)
+        for msg in e.errors:
+            print("  " + msg, file=sys.stderr)
+        return 1
+    print(f"{stats['total']} districts: {stats['rebuilt']} rebuilt, "
+          f"{stats['reused']} unchanged, {stats['removed']} removed")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,186 @@
+import json
+
+import pytest
+
+from group_design import compiler
+from group_design.compiler import LocationDataError, build, main
+
+HEADERS = {
+    "wind.csv": "state,district,wind",
+    "seismic.csv": "state,district,seismic_zone,seismic_factor",
+    "temperature.csv": "state,district,temp_max,temp_min",
+}
+
+
+def write_sources(src, wind, seismic, temperature):
+    src.mkdir(exist_ok=True)
+    for name, rows in (("wind.csv", wind), ("seismic.csv", seismic), ("temperature.csv", temperature)):
+        lines = [HEADERS[name]] + [",".join(str(v) for v in row) for row in rows]
+        (src / name).write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def single(src, wind=39, zone="III", factor=0.16, tmax=36, tmin=18, state="Maharashtra", district="Mumbai"):
+    write_sources(
+        src,
+        [(state, district, wind)],
+        [(state, district, zone, factor)],
+        [(state, district, tmax, tmin)],
+    )
+
+
+def test_build_writes_runtime_layout(tmp_path):
+    single(tmp_path / "src")
+    out = tmp_path / "db.json"
+    stats = build(str(tmp_path / "src"), str(out))
+    assert stats == {"total": 1, "rebuilt": 1, "reused": 0, "removed": 0}
+    assert json.loads(out.read_text()) == {
+        "Maharashtra": {
+            "Mumbai": {"wind": 39, "seismic_zone": "III", "seismic_factor": 0.16, "temp_max": 36, "temp_min": 18}
+        }
+    }
+
+
+@pytest.mark.parametrize("overrides, message", [
+    ({"zone": "IV", "factor": 0.16}, "does not match zone IV"),
+    ({"zone": "VI"}, "unknown seismic zone"),
+    ({"tmax": 10, "tmin": 20}, "must be greater than temp_min"),
+    ({"tmax": 20, "tmin": 20}, "must be greater than temp_min"),
+    ({"wind": "fast"}, "is not a number"),
+    ({"wind": "nan"}, "not a finite number"),
+    ({"wind": "inf"}, "not a finite number"),
+    ({"factor": "nan"}, "not a finite number"),
+    ({"tmax": "nan", "tmin": "nan"}, "not a finite number"),
+    ({"wind": 0}, "outside"),
+    ({"tmax": 1e6, "tmin": -1e6}, "outside"),
+])
+def test_invalid_values_are_rejected(tmp_path, overrides, message):
+    single(tmp_path / "src", **overrides)
+    with pytest.raises(LocationDataError) as exc:
+        build(str(tmp_path / "src"), str(tmp_path / "db.json"))
+    assert any(message in e for e in exc.value.errors)
+
+
+def test_nothing_written_on_failure(tmp_path):
+    src, out = tmp_path / "src", tmp_path / "db.json"
+    single(src)
+    build(str(src), str(out))
+    before = out.read_text()
+    single(src, wind="nan")
+    with pytest.raises(LocationDataError):
+        build(str(src), str(out))
+    assert out.read_text() == before
+
+
+def test_missing_file_reports_only_the_file(tmp_path):
+    src = tmp_path / "src"
+    names = [("S", f"D{i}") for i in range(50)]
+    write_sources(src, [n + (39,) for n in names], [n + ("III", 0.16) for n in names],
+                  [n + (36, 18) for n in names])
+    (src / "seismic.csv").unlink()
+    with pytest.raises(LocationDataError) as exc:
+        build(str(src), str(tmp_path / "db.json"))
+    assert exc.value.errors == ["seismic.csv: file not found"]
+
+
+@pytest.mark.parametrize("before", ["", '"S","Multi\nline",39\n'])
+def test_error_line_numbers_are_physical_lines(tmp_path, before):
+    src = tmp_path / "src"
+    single(src, state="S", district="A")
+    text = "state,district,wind\nS,A,39\n\n" + before + "S,A,44\n"
+    (src / "wind.csv").write_text(text, encoding="utf-8")
+    with pytest.raises(LocationDataError) as exc:
+        build(str(src), str(tmp_path / "db.json"))
+    line = text.count("\n")
+    assert exc.value.errors == [f"wind.csv:{line}: duplicate row for S / A"]
+
+
+def test_district_missing_from_one_source(tmp_path):
+    src = tmp_path / "src"
+    write_sources(src, [("S", "A", 39), ("S", "B", 39)], [("S", "A", "III", 0.16)],
+                  [("S", "A", 36, 18), ("S", "B", 36, 18)])
+    with pytest.raises(LocationDataError) as exc:
+        build(str(src), str(tmp_path / "db.json"))
+    assert exc.value.errors == ["S / B: no row in seismic.csv"]
+
+
+def test_separator_in_names_does_not_collide(tmp_path):
+    src = tmp_path / "src"
+    names = [("A|B", "C"), ("A", "B|C")]
+    write_sources(src, [n + (39,) for n in names], [n + ("III", 0.16) for n in names],
+                  [n + (36, 18) for n in names])
+    out = tmp_path / "db.json"
+    build(str(src), str(out))
+    assert build(str(src), str(out))["total"] == 2
+    assert set(json.loads(out.read_text())) == {"A|B", "A"}
+
+
+def nationwide(src, n_states=36, n_districts=25, wind_override=None):
+    names = [(f"State{i}", f"District{j}") for i in range(n_states) for j in range(n_districts)]
+    wind = [n + (39,) for n in names]
+    if wind_override:
+        wind[wind_override[0]] = names[wind_override[0]] + (wind_override[1],)
+    write_sources(src, wind, [n + ("III", 0.16) for n in names], [n + (36, 18) for n in names])
+    return len(names)
+
+
+def test_incremental_rebuild_after_one_row_edit(tmp_path):
+    src, out = tmp_path / "src", tmp_path / "db.json"
+    total = nationwide(src)
+    assert build(str(src), str(out))["rebuilt"] == total
+
+    assert build(str(src), str(out)) == {"total": total, "rebuilt": 0, "reused": total, "removed": 0}
+
+    nationwide(src, wind_override=(100, 44))
+    stats = build(str(src), str(out))
+    assert stats == {"total": total, "rebuilt": 1, "reused": total - 1, "removed": 0}
+    assert json.loads(out.read_text())["State4"]["District0"]["wind"] == 44
+
+    assert build(str(src), str(out), full=True)["rebuilt"] == total
+
+
+def test_removed_districts_counted_in_full_mode(tmp_path):
+    src, out = tmp_path / "src", tmp_path / "db.json"
+    nationwide(src, n_states=1, n_districts=3)
+    build(str(src), str(out))
+    nationwide(src, n_states=1, n_districts=2)
+    assert build(str(src), str(out), full=True)["removed"] == 1
+
+
+def test_changed_rules_invalidate_cached_records(tmp_path, monkeypatch):
+    src, out = tmp_path / "src", tmp_path / "db.json"
+    single(src, wind=90)
+    build(str(src), str(out))
+    monkeypatch.setattr(compiler, "WIND_RANGE", (10.0, 60.0))
+    with pytest.raises(LocationDataError) as exc:
+        build(str(src), str(out))
+    assert any("wind 90 is outside" in e for e in exc.value.errors)
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda m: m["files"]["wind"]["rows"][0].__setitem__(2, "39"),
+    lambda m: m["files"]["wind"]["rows"][0].__setitem__(2, {"speed": "39"}),
+    lambda m: m["files"]["wind"]["rows"][0].__setitem__(2, {"wind": 39}),
+    lambda m: m["records"][0][2].__setitem__("wind", "39"),
+    lambda m: m["records"][0][2].pop("temp_min"),
+    lambda m: m.__setitem__("files", []),
+    lambda m: m["records"].append(["S", "D"]),
+])
+def test_malformed_manifest_is_ignored(tmp_path, corrupt):
+    src, out = tmp_path / "src", tmp_path / "db.json"
+    single(src)
+    build(str(src), str(out))
+    manifest_path = tmp_path / "db.manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    corrupt(manifest)
+    manifest_path.write_text(json.dumps(manifest))
+    assert build(str(src), str(out)) == {"total": 1, "rebuilt": 1, "reused": 0, "removed": 0}
+    assert json.loads(out.read_text())["Maharashtra"]["Mumbai"]["wind"] == 39
+
+
+def test_main_reports_errors_on_stderr(tmp_path, capsys):
+    single(tmp_path / "src", zone="IV")
+    rc = main([str(tmp_path / "src"), "-o", str(tmp_path / "db.json")])
+    captured = capsys.readouterr()
+    assert rc == 1
+    assert captured.out == ""
+    assert "does not match zone IV" in captured.err